@@ -10,6 +10,60 @@ import sys
 from datetime import datetime
 from repo_summary_bot import GitHubRepoBot
 
+# Parsed configuration files keyed by path, stored with the mtime they were read at
+_config_cache = {}
+
+def _load_config(path):
+    """Load a JSON configuration file, reusing the parsed copy while the file is unchanged"""
+    mtime = os.stat(path).st_mtime
+    cached = _config_cache.get(path)
+
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, "r") as f:
+        config = json.load(f)
+
+    _config_cache[path] = (mtime, config)
+    return config
+
+def _positive_int(value):
+    """argparse type for options that must be a whole number of at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer value: {value!r}")
+
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+
+    return number
+
+def _load_config_or_last_good(path):
+    """Load a configuration file, falling back to the last good parse if it is unreadable
+
+    Lets the daemon ride out a repos.json that is mid-write, invalid or briefly missing.
+    """
+    try:
+        return _load_config(path)
+    except (OSError, ValueError) as e:
+        cached = _config_cache.get(path)
+        if not cached:
+            raise
+
+        print(f"Error reading {path}, using last good configuration: {e}")
+        return cached[1]
+
+def _run_scheduled_check(bot, config_file):
+    """Check the currently configured repositories, picking up config edits"""
+    try:
+        repositories = _load_config_or_last_good(config_file).get("repositories", [])
+    except (OSError, ValueError) as e:
+        print(f"Error reading {config_file}, skipping scheduled check: {e}")
+        return
+
+    bot.check_all_repos(repositories)
+
 def init_config(args):
     """Initialize configuration files"""
     config_file = args.config or "repos.json"
@@ -45,6 +99,7 @@ def init_config(args):
 
 def check_single(args):
     """Check a single repository"""
+    bot = None
     try:
         bot = GitHubRepoBot()
         summary = bot.check_repo_for_changes(args.repo)
@@ -59,6 +114,9 @@ def check_single(args):
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
+    finally:
+        if bot:
+            bot.close()
 
 def check_all(args):
     """Check all configured repositories"""
@@ -68,9 +126,9 @@ def check_all(args):
         print(f"Configuration file {config_file} not found. Run 'python cli.py init' first.")
         sys.exit(1)
 
+    bot = None
     try:
-        with open(config_file, "r") as f:
-            config = json.load(f)
+        config = _load_config(config_file)
 
         repositories = config.get("repositories", [])
 
@@ -84,9 +142,13 @@ def check_all(args):
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
+    finally:
+        if bot:
+            bot.close()
 
 def show_summaries(args):
     """Show recent summaries"""
+    bot = None
     try:
         bot = GitHubRepoBot()
         summaries = bot.get_recent_summaries(args.repo, args.limit)
@@ -107,9 +169,13 @@ def show_summaries(args):
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
+    finally:
+        if bot:
+            bot.close()
 
 def test_slack(args):
     """Test Slack webhook connection"""
+    bot = None
     try:
         bot = GitHubRepoBot()
 
@@ -122,6 +188,26 @@ def test_slack(args):
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
+    finally:
+        if bot:
+            bot.close()
+
+def _run_webhook_check(bot, config_file, repos):
+    """Check repositories announced by webhook deliveries, ignoring unconfigured ones"""
+    if not repos:
+        return
+
+    try:
+        configured = set(_load_config_or_last_good(config_file).get("repositories", []))
+    except (OSError, ValueError) as e:
+        print(f"Error reading {config_file}, ignoring webhook deliveries: {e}")
+        return
+
+    repositories = sorted(repo for repo in repos if repo in configured)
+
+    if repositories:
+        # The delivery already reported activity, so skip the event feed probe
+        bot.check_all_repos(repositories, probe=False)
 
 def run_daemon(args):
     """Run the bot in daemon mode"""
@@ -131,13 +217,14 @@ def run_daemon(args):
         print(f"Configuration file {config_file} not found. Run 'python cli.py init' first.")
         sys.exit(1)
 
+    bot = None
+    webhook = None
     try:
         # Import here to avoid import errors if schedule not needed
         import schedule
         import time
 
-        with open(config_file, "r") as f:
-            config = json.load(f)
+        config = _load_config(config_file)
 
         repositories = config.get("repositories", [])
         schedule_hours = config.get("schedule_hours", [9, 17])
@@ -147,18 +234,24 @@ def run_daemon(args):
             sys.exit(1)
 
         bot = GitHubRepoBot()
+        # Fail now rather than at the first scheduled check or webhook delivery
+        bot.require_credentials()
 
         # Schedule regular checks
         for hour in schedule_hours:
-            schedule.every().day.at(f"{hour:02d}:00").do(
-                lambda: bot.check_all_repos(repositories)
-            )
+            schedule.every().day.at(f"{hour:02d}:00").do(_run_scheduled_check, bot, config_file)
 
         print(f"Bot started in daemon mode")
         print(f"Monitoring {len(repositories)} repositories")
         print(f"Scheduled checks at: {', '.join(f'{h}:00' for h in schedule_hours)}")
         print("Press Ctrl+C to stop")
 
+        if args.webhook_port:
+            from webhook_server import WebhookServer
+
+            webhook = WebhookServer(args.webhook_port, os.getenv("GITHUB_WEBHOOK_SECRET"))
+            webhook.start()
+
         # Run initial check
         if not args.no_initial:
             print("\nRunning initial check...")
@@ -167,13 +260,22 @@ def run_daemon(args):
         # Keep running
         while True:
             schedule.run_pending()
-            time.sleep(60)
+
+            if webhook:
+                _run_webhook_check(bot, config_file, webhook.wait_for_repos(timeout=args.poll_interval))
+            else:
+                time.sleep(args.poll_interval)
 
     except KeyboardInterrupt:
         print("\nBot stopped by user")
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
+    finally:
+        if webhook:
+            webhook.stop()
+        if bot:
+            bot.close()
 
 def main():
     parser = argparse.ArgumentParser(
@@ -187,6 +289,7 @@ Examples:
   python cli.py summaries -l 5               # Show 5 recent summaries
   python cli.py test-slack                   # Test Slack webhook connection
   python cli.py daemon                       # Run in scheduled mode
+  python cli.py daemon --webhook-port 8080   # Scheduled mode plus webhook-triggered checks
         """
     )
 
@@ -221,6 +324,8 @@ Examples:
     daemon_parser = subparsers.add_parser("daemon", help="Run bot in scheduled daemon mode")
     daemon_parser.add_argument("--config", help="Configuration file path (default: repos.json)")
     daemon_parser.add_argument("--no-initial", action="store_true", help="Skip initial check on startup")
+    daemon_parser.add_argument("--webhook-port", type=int, help="Also listen for GitHub push/pull_request webhooks on this port")
+    daemon_parser.add_argument("--poll-interval", type=_positive_int, default=60, help="Seconds between checks for due scheduled jobs (default: 60)")
     daemon_parser.set_defaults(func=run_daemon)
 
     args = parser.parse_args()
@@ -7,20 +7,105 @@ of commits, pull requests, and other repository activity.
 """
 
 import os
+import sys
 import json
 import sqlite3
 import requests
-import schedule
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
-from openai import OpenAI
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from slack_notifier import SlackNotifier
 
 load_dotenv()
 
+# Commits on the default branch since a timestamp plus the most recently updated PRs,
+# fetched in a single round trip. Page sizes match what format_changes_for_ai uses;
+# totalCount keeps the reported change count accurate beyond the first page.
+REPO_ACTIVITY_QUERY = """
+query($owner: String!, $name: String!, $since: GitTimestamp!) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(since: $since, first: 10) {
+            totalCount
+            nodes { oid messageHeadline author { name date } }
+          }
+        }
+      }
+    }
+    pullRequests(first: 10, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      nodes { state title createdAt updatedAt author { login } }
+    }
+  }
+}
+"""
+
+# Event feed entries that mean the GraphQL activity query has something new to report
+ACTIVITY_EVENT_TYPES = ("PushEvent", "PullRequestEvent", "PullRequestReviewEvent", "PullRequestReviewCommentEvent")
+EVENTS_PAGE_SIZE = 30
+
+SUMMARY_FORMAT_INSTRUCTIONS = """Format each summary with these sections:
+
+## Currently Open Pull Requests
+[Summarize the open PRs - what features/fixes are being worked on]
+
+## Recent Pushes to Default Branch
+[Summarize recent commits - what was actually merged/completed]
+
+## Development Trends
+[Overall patterns, notable contributors, and key themes]
+
+Keep each section concise (2-3 sentences max) and highlight the most important changes. If a section has no data, you can skip it."""
+
 class GitHubRepoBot:
+    # Upper bound on repositories checked concurrently by check_all_repos
+    MAX_WORKERS = 8
+    # Repositories summarized per OpenAI request by generate_summaries_batch
+    SUMMARY_BATCH_SIZE = 5
+
+    # SQL statements, defined once so the persistent connection's statement cache keeps hitting
+    SQL_GET_LAST_CHECK = "SELECT last_check_timestamp FROM repo_states WHERE repo_name = ?"
+    SQL_GET_ETAG = "SELECT events_etag FROM repo_states WHERE repo_name = ?"
+    SQL_UPSERT_ETAG = '''
+        INSERT INTO repo_states (repo_name, events_etag)
+        VALUES (?, ?)
+        ON CONFLICT (repo_name) DO UPDATE SET
+            events_etag = excluded.events_etag
+    '''
+    # A NULL SHA keeps the stored one (PR-only changes)
+    SQL_UPSERT_STATE = '''
+        INSERT INTO repo_states (repo_name, last_commit_sha, last_check_timestamp, events_etag)
+        VALUES (?, COALESCE(?, (SELECT last_commit_sha FROM repo_states WHERE repo_name = ?), ''), ?, ?)
+        ON CONFLICT (repo_name) DO UPDATE SET
+            last_commit_sha = excluded.last_commit_sha,
+            last_check_timestamp = excluded.last_check_timestamp,
+            events_etag = excluded.events_etag
+    '''
+    SQL_INSERT_SUMMARY = '''
+        INSERT INTO summaries (repo_name, summary, changes_count, timestamp)
+        VALUES (?, ?, ?, ?)
+    '''
+    SQL_SELECT_REPO_SUMMARIES = '''
+        SELECT repo_name, summary, changes_count, timestamp
+        FROM summaries
+        WHERE repo_name = ?
+        ORDER BY timestamp DESC, id DESC
+        LIMIT ?
+    '''
+    SQL_SELECT_SUMMARIES = '''
+        SELECT repo_name, summary, changes_count, timestamp
+        FROM summaries
+        ORDER BY timestamp DESC, id DESC
+        LIMIT ?
+    '''
+
     def __init__(self, db_path: str = "repo_summaries.db"):
         self.github_token = os.getenv("GITHUB_TOKEN")
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -30,14 +115,6 @@ class GitHubRepoBot:
         self.db_path = db_path
         self.base_url = "https://api.github.com"
 
-        if not self.github_token:
-            raise ValueError("GITHUB_TOKEN environment variable is required")
-
-        if not self.openai_api_key:
-            raise ValueError("OPENAI_API_KEY environment variable is required")
-
-        self.client = OpenAI(api_key=self.openai_api_key)
-
         # Initialize Slack notifier if webhook URL is provided
         self.slack_notifier = None
         if self.slack_webhook_url:
@@ -46,107 +123,309 @@ class GitHubRepoBot:
         else:
             print("ℹ️  Slack notifications disabled (no SLACK_WEBHOOK_URL configured)")
 
-        self.headers = {
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("PRAGMA cache_size=-20000")
+        # Serve reads straight from the page cache instead of read() syscalls
+        self._conn.execute("PRAGMA mmap_size=134217728")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        # The connection is shared by the check_all_repos worker threads
+        self._db_lock = threading.RLock()
+
+        # Shared timestamp for every row written during a check_all_repos run
+        self._run_ts: Optional[str] = None
+
+        # Rows awaiting _flush_pending, so a whole check run commits at once. Keyed by
+        # repository: after a failed write last_check has not advanced, so a later check
+        # covers the same activity again and its rows replace the queued ones
+        self._pending_etags: Dict[str, tuple] = {}
+        self._pending_states: Dict[str, tuple] = {}
+        self._pending_summaries: Dict[str, tuple] = {}
+
+        self.init_database()
+
+    # Credentials are checked and API clients built on first use, so DB-only
+    # commands such as 'summaries' work without any tokens configured
+
+    @cached_property
+    def _gh_headers(self) -> Dict[str, str]:
+        """GitHub API headers"""
+        if not self.github_token:
+            raise ValueError("GITHUB_TOKEN environment variable is required")
+
+        return {
             "Authorization": f"token {self.github_token}",
             "Accept": "application/vnd.github.v3+json"
         }
 
-        self.init_database()
+    @cached_property
+    def session(self) -> requests.Session:
+        """Shared session so repeated GitHub calls reuse keep-alive connections"""
+        session = requests.Session()
+        session.headers.update(self._gh_headers)
+        retries = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[502, 503, 504],
+            # GraphQL queries are POSTs but only read data, so they are safe to retry
+            allowed_methods=frozenset({"GET", "POST"})
+        )
+        session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retries))
+
+        return session
+
+    @cached_property
+    def client(self):
+        """OpenAI client"""
+        if not self.openai_api_key:
+            raise ValueError("OPENAI_API_KEY environment variable is required")
+
+        from openai import OpenAI
+
+        return OpenAI(api_key=self.openai_api_key)
+
+    def require_credentials(self):
+        """Fail fast before a check if either API credential is missing
+
+        Also builds the session and client up front rather than racing to do so
+        in the check_all_repos worker threads.
+        """
+        self.session
+        self.client
+
+    def close(self):
+        """Close the persistent database connection and HTTP session"""
+        # Last chance for rows left queued by a failed write
+        self._save_pending()
+        if "session" in self.__dict__:
+            self.session.close()
+        with self._db_lock:
+            self._conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        """Run the enclosed statements in a single write transaction"""
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
 
     def init_database(self):
         """Initialize SQLite database for storing repository states and summaries"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS repo_states (
-                repo_name TEXT PRIMARY KEY,
-                last_commit_sha TEXT,
-                last_check_timestamp TEXT
+        with self._transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS repo_states (
+                    repo_name TEXT PRIMARY KEY,
+                    last_commit_sha TEXT,
+                    last_check_timestamp TEXT,
+                    events_etag TEXT
+                )
+            ''')
+
+            # Databases created before ETag caching lack the ETag column
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(repo_states)")}
+            if "events_etag" not in columns:
+                conn.execute("ALTER TABLE repo_states ADD COLUMN events_etag TEXT")
+
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS summaries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    repo_name TEXT,
+                    summary TEXT,
+                    changes_count INTEGER,
+                    timestamp TEXT,
+                    FOREIGN KEY (repo_name) REFERENCES repo_states (repo_name)
+                )
+            ''')
+
+            # Support get_recent_summaries with and without a repository filter. Rows from
+            # one check run share a timestamp, so id breaks ties in insertion order
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_summaries_repo_ts ON summaries (repo_name, timestamp DESC, id DESC)"
             )
-        ''')
-
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS summaries (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                repo_name TEXT,
-                summary TEXT,
-                changes_count INTEGER,
-                timestamp TEXT,
-                FOREIGN KEY (repo_name) REFERENCES repo_states (repo_name)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_summaries_ts ON summaries (timestamp DESC, id DESC)"
             )
-        ''')
 
-        conn.commit()
-        conn.close()
+    def get_repo_events(self, repo_name: str, etag: Optional[str] = None) -> Tuple[Optional[List[Dict]], Optional[str]]:
+        """Fetch the newest page of repository events, returning (events, etag)
 
-    def get_repo_commits(self, repo_name: str, since: Optional[str] = None) -> List[Dict]:
-        """Fetch commits from a repository since a specific timestamp"""
-        url = f"{self.base_url}/repos/{repo_name}/commits"
-        params = {}
+        With an ETag the request is conditional and (None, etag) is returned when
+        nothing happened; 304 responses do not count against the primary rate limit.
+        """
+        url = f"{self.base_url}/repos/{repo_name}/events"
+        headers = {"If-None-Match": etag} if etag else {}
 
-        if since:
-            params["since"] = since
-
-        response = requests.get(url, headers=self.headers, params=params)
+        response = self.session.get(url, params={"per_page": EVENTS_PAGE_SIZE}, headers=headers)
+        if response.status_code == 304:
+            return None, etag
         response.raise_for_status()
 
-        return response.json()
-
-    def get_repo_pulls(self, repo_name: str, state: str = "all") -> List[Dict]:
-        """Fetch pull requests from a repository"""
-        url = f"{self.base_url}/repos/{repo_name}/pulls"
-        params = {"state": state, "sort": "updated", "direction": "desc", "per_page": 10}
-
-        response = requests.get(url, headers=self.headers, params=params)
+        return response.json(), response.headers.get("ETag")
+
+    def probe_repo_for_changes(self, repo_name: str, last_check: Optional[str],
+                               etag: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """Check the repository event feed for pushes or PR activity since the last check
+
+        Returns whether the full GraphQL fetch is needed and the event feed's current ETag.
+        The events API can lag behind real activity; anything it has not surfaced yet is
+        picked up on a later check because last_check only advances after a full fetch.
+        """
+        events, etag = self.get_repo_events(repo_name, etag)
+        if events is None:
+            return False, etag
+
+        if not last_check:
+            return True, etag
+
+        threshold = last_check.rstrip('Z')
+        if any(
+            event["type"] in ACTIVITY_EVENT_TYPES and event["created_at"].rstrip('Z') > threshold
+            for event in events
+        ):
+            return True, etag
+
+        # A full page of events newer than the last check (stars, forks, comments...)
+        # may have pushed older activity off the page, so only a full fetch can tell
+        if len(events) < EVENTS_PAGE_SIZE:
+            return False, etag
+
+        oldest = min(event["created_at"].rstrip('Z') for event in events)
+        return oldest > threshold, etag
+
+    def _graphql(self, query: str, variables: Dict) -> Dict:
+        """Run a GitHub GraphQL query and return its data"""
+        response = self.session.post(
+            f"{self.base_url}/graphql",
+            json={"query": query, "variables": variables}
+        )
         response.raise_for_status()
 
-        return response.json()
+        payload = response.json()
+        if payload.get("errors"):
+            messages = "; ".join(error.get("message", "") for error in payload["errors"])
+            raise requests.exceptions.RequestException(f"GraphQL error: {messages}")
+
+        return payload["data"]
+
+    def get_repo_activity(self, repo_name: str, since: str) -> Tuple[List[Dict], int, List[Dict]]:
+        """Fetch commits since a timestamp and recently updated pull requests in one request
+
+        Returns the latest commits, the total number of commits since the timestamp and
+        the pull requests.
+        """
+        owner, name = repo_name.split("/", 1)
+        if not since.endswith("Z") and "+" not in since:
+            since = f"{since}Z"
+
+        data = self._graphql(REPO_ACTIVITY_QUERY, {"owner": owner, "name": name, "since": since})
+        repo = data.get("repository") or {}
+
+        commits = []
+        commit_count = 0
+        branch = repo.get("defaultBranchRef")
+        if branch:
+            history = branch["target"]["history"]
+            commit_count = history["totalCount"]
+            for node in history["nodes"]:
+                author = node.get("author") or {}
+                commits.append({
+                    "sha": node["oid"],
+                    "message": node["messageHeadline"],
+                    "author": author.get("name") or "unknown",
+                    "date": author.get("date")
+                })
+
+        pulls = []
+        for node in (repo.get("pullRequests") or {}).get("nodes", []):
+            author = node.get("author") or {}
+            pulls.append({
+                # GraphQL reports merged PRs separately; treat them as closed like REST does
+                "state": "open" if node["state"] == "OPEN" else "closed",
+                "title": node["title"],
+                "author": author.get("login") or "ghost",
+                "created_at": node["createdAt"],
+                "updated_at": node["updatedAt"]
+            })
+
+        return commits, commit_count, pulls
+
+    def _timestamp(self) -> str:
+        """Timestamp for new rows: the current run's if one is in progress, otherwise now"""
+        return self._run_ts or datetime.utcnow().isoformat()
 
     def get_last_check_time(self, repo_name: str) -> Optional[str]:
         """Get the last check timestamp for a repository"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._db_lock:
+            result = self._conn.execute(self.SQL_GET_LAST_CHECK, (repo_name,)).fetchone()
 
-        cursor.execute(
-            "SELECT last_check_timestamp FROM repo_states WHERE repo_name = ?",
-            (repo_name,)
-        )
+        return result[0] if result else None
 
-        result = cursor.fetchone()
-        conn.close()
+    def get_repo_etag(self, repo_name: str) -> Optional[str]:
+        """Get the stored event feed ETag for a repository"""
+        with self._db_lock:
+            result = self._conn.execute(self.SQL_GET_ETAG, (repo_name,)).fetchone()
 
         return result[0] if result else None
 
-    def update_repo_state(self, repo_name: str, last_commit_sha: str):
-        """Update the repository state in the database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _queue_etag(self, repo_name: str, etag: Optional[str]):
+        """Queue the event feed ETag to be stored without touching the rest of the repository state"""
+        with self._db_lock:
+            self._pending_etags[repo_name] = (repo_name, etag)
 
-        timestamp = datetime.utcnow().isoformat()
+    def _queue_check_result(self, changes: Dict, summary: str):
+        """Queue the repository state, event feed ETag and summary for the next flush
 
-        cursor.execute('''
-            INSERT OR REPLACE INTO repo_states (repo_name, last_commit_sha, last_check_timestamp)
-            VALUES (?, ?, ?)
-        ''', (repo_name, last_commit_sha, timestamp))
+        Takes the changes returned by collect_repo_changes. A last_commit_sha of None
+        keeps the previously stored SHA (PR-only changes).
+        """
+        repo_name = changes["repo_name"]
+        timestamp = changes["checked_at"]
 
-        conn.commit()
-        conn.close()
+        with self._db_lock:
+            self._pending_states[repo_name] = (
+                repo_name, changes["last_commit_sha"], repo_name, timestamp, changes["etag"]
+            )
+            self._pending_summaries[repo_name] = (repo_name, summary, changes["changes_count"], timestamp)
+            # The state row already carries the ETag
+            self._pending_etags.pop(repo_name, None)
 
-    def save_summary(self, repo_name: str, summary: str, changes_count: int):
-        """Save a generated summary to the database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _flush_pending(self):
+        """Write all queued ETags, repository states and summaries in one transaction"""
+        with self._db_lock:
+            if not (self._pending_etags or self._pending_states or self._pending_summaries):
+                return
 
-        timestamp = datetime.utcnow().isoformat()
+            with self._transaction() as conn:
+                if self._pending_etags:
+                    conn.executemany(self.SQL_UPSERT_ETAG, self._pending_etags.values())
 
-        cursor.execute('''
-            INSERT INTO summaries (repo_name, summary, changes_count, timestamp)
-            VALUES (?, ?, ?, ?)
-        ''', (repo_name, summary, changes_count, timestamp))
+                if self._pending_states:
+                    conn.executemany(self.SQL_UPSERT_STATE, self._pending_states.values())
 
-        conn.commit()
-        conn.close()
+                if self._pending_summaries:
+                    conn.executemany(self.SQL_INSERT_SUMMARY, self._pending_summaries.values())
+
+            self._pending_etags.clear()
+            self._pending_states.clear()
+            self._pending_summaries.clear()
+
+    def _save_pending(self):
+        """Flush queued rows, logging a failed write instead of raising
+
+        The rows stay queued, so the next flush retries them.
+        """
+        try:
+            self._flush_pending()
+        except sqlite3.Error as e:
+            print(f"Error saving results, will retry on the next check: {e}")
 
     def format_changes_for_ai(self, commits: List[Dict], pulls: List[Dict]) -> str:
         """Format repository changes for AI summarization with structured sections"""
@@ -159,53 +438,91 @@ class GitHubRepoBot:
         # Currently Open Pull Requests
         if open_prs:
             content.append("CURRENTLY OPEN PULL REQUESTS:")
-            for pr in open_prs[:5]:  # Limit to 5 most recent
-                title = pr["title"]
-                author = pr["user"]["login"]
-                created = pr["created_at"]
-                content.append(f"- {title} (by {author}, opened {created})")
+            content.extend(
+                f"- {pr['title']} (by {pr['author']}, opened {pr['created_at']})"
+                for pr in open_prs[:5]  # Limit to 5 most recent
+            )
             content.append("")  # Add blank line
 
         # Recent Pushes to Default Branch (commits)
         if commits:
             content.append("RECENT PUSHES TO DEFAULT BRANCH:")
-            for commit in commits[:10]:  # Limit to 10 most recent
-                commit_msg = commit["commit"]["message"].split("\n")[0]  # First line only
-                author = commit["commit"]["author"]["name"]
-                date = commit["commit"]["author"]["date"]
-                content.append(f"- {commit_msg} (by {author} on {date})")
+            content.extend(
+                f"- {commit['message']} (by {commit['author']} on {commit['date']})"
+                for commit in commits[:10]  # Limit to 10 most recent
+            )
             content.append("")  # Add blank line
 
         # Recently Closed/Merged PRs (if any)
         if closed_prs:
             content.append("RECENTLY CLOSED/MERGED PULL REQUESTS:")
-            for pr in closed_prs[:3]:  # Limit to 3 most recent
-                title = pr["title"]
-                author = pr["user"]["login"]
-                updated = pr["updated_at"]
-                content.append(f"- {title} (by {author}, closed {updated})")
+            content.extend(
+                f"- {pr['title']} (by {pr['author']}, closed {pr['updated_at']})"
+                for pr in closed_prs[:3]  # Limit to 3 most recent
+            )
 
         return "\n".join(content)
 
-    def generate_summary(self, changes_text: str, repo_name: str) -> str:
-        """Generate AI summary of repository changes using OpenAI"""
+    def generate_summary(self, changes_text: str, repo_name: str, stream: bool = False) -> str:
+        """Generate AI summary of repository changes using OpenAI
+
+        With stream=True the summary is echoed to stdout as tokens arrive.
+        """
         prompt = f"""
 Please provide a structured summary of the recent activity in the GitHub repository '{repo_name}':
 
 {changes_text}
 
-Format your response with these sections:
+{SUMMARY_FORMAT_INSTRUCTIONS}
+"""
 
-## Currently Open Pull Requests
-[Summarize the open PRs - what features/fixes are being worked on]
+        try:
+            response = self.client.chat.completions.create(
+                model=self.openai_model,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=300,
+                temperature=0.7,
+                stream=stream
+            )
 
-## Recent Pushes to Default Branch
-[Summarize recent commits - what was actually merged/completed]
+            if not stream:
+                return response.choices[0].message.content
 
-## Development Trends
-[Overall patterns, notable contributors, and key themes]
+            parts = []
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                piece = chunk.choices[0].delta.content or ""
+                sys.stdout.write(piece)
+                sys.stdout.flush()
+                parts.append(piece)
+            sys.stdout.write("\n")
+
+            return "".join(parts)
+        except Exception as e:
+            message = f"Error generating summary: {str(e)}"
+            if stream:
+                print(message)
+            return message
+
+    def _generate_summaries_request(self, changes_by_repo: Dict[str, str]) -> Dict[str, str]:
+        """Summarize several repositories with a single JSON-mode chat completion"""
+        sections = "\n\n".join(
+            f"=== {repo_name} ===\n{changes_text}"
+            for repo_name, changes_text in changes_by_repo.items()
+        )
+        prompt = f"""
+Please provide a structured summary of the recent activity in each of the following GitHub repositories.
+Each repository's activity is listed under a "=== owner/name ===" header:
+
+{sections}
+
+Respond with a JSON object whose keys are the repository names exactly as written in the headers
+and whose values are that repository's summary as a markdown string.
 
-Keep each section concise (2-3 sentences max) and highlight the most important changes. If a section has no data, you can skip it.
+{SUMMARY_FORMAT_INSTRUCTIONS}
 """
 
         try:
@@ -214,131 +531,189 @@ Keep each section concise (2-3 sentences max) and highlight the most important c
                 messages=[
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=300,
-                temperature=0.7
+                max_tokens=300 * len(changes_by_repo),
+                temperature=0.7,
+                response_format={"type": "json_object"}
             )
-            return response.choices[0].message.content
+            summaries = json.loads(response.choices[0].message.content)
         except Exception as e:
-            return f"Error generating summary: {str(e)}"
+            print(f"Batched summary request failed, summarizing individually: {e}")
+            summaries = {}
+
+        # Anything the model dropped or mangled falls back to a per-repository request
+        return {
+            repo_name: summaries[repo_name]
+            if isinstance(summaries.get(repo_name), str)
+            else self.generate_summary(changes_text, repo_name)
+            for repo_name, changes_text in changes_by_repo.items()
+        }
 
-    def check_repo_for_changes(self, repo_name: str) -> Optional[str]:
-        """Check a single repository for changes and generate summary if needed"""
+    def generate_summaries_batch(self, changes_by_repo: Dict[str, str]) -> Dict[str, str]:
+        """Generate AI summaries for several repositories in as few OpenAI requests as possible"""
+        if not changes_by_repo:
+            return {}
+
+        if len(changes_by_repo) == 1:
+            repo_name, changes_text = next(iter(changes_by_repo.items()))
+            return {repo_name: self.generate_summary(changes_text, repo_name)}
+
+        items = list(changes_by_repo.items())
+        batches = [
+            dict(items[i:i + self.SUMMARY_BATCH_SIZE])
+            for i in range(0, len(items), self.SUMMARY_BATCH_SIZE)
+        ]
+
+        summaries = {}
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(batches))) as executor:
+            for batch_summaries in executor.map(self._generate_summaries_request, batches):
+                summaries.update(batch_summaries)
+
+        return summaries
+
+    def collect_repo_changes(self, repo_name: str, probe: bool = True) -> Optional[Dict]:
+        """Fetch new activity for a repository, returning None when there is nothing to summarize
+
+        With probe=False the event feed check is skipped, e.g. when a webhook delivery
+        already announced the activity.
+        """
         try:
             print(f"Checking repository: {repo_name}")
 
             last_check = self.get_last_check_time(repo_name)
-            since_param = last_check if last_check else (datetime.utcnow() - timedelta(days=7)).isoformat()
+            etag = self.get_repo_etag(repo_name)
 
-            # Get recent commits and pull requests
-            commits = self.get_repo_commits(repo_name, since_param)
-            pulls = self.get_repo_pulls(repo_name)
-
-            # Filter pulls updated since last check
-            if last_check:
-                # Handle both timezone-aware and naive datetime strings
-                if last_check.endswith('Z'):
-                    last_check_dt = datetime.fromisoformat(last_check.replace('Z', '+00:00'))
-                else:
-                    last_check_dt = datetime.fromisoformat(last_check)
+            # Skip the full fetch when the event feed shows nothing new since the last check
+            if probe:
+                changed, etag = self.probe_repo_for_changes(repo_name, last_check, etag)
+                if not changed:
+                    self._queue_etag(repo_name, etag)
+                    print(f"No new changes found for {repo_name}")
+                    return None
 
-                filtered_pulls = []
-                for pr in pulls:
-                    pr_updated = pr['updated_at']
-                    if pr_updated.endswith('Z'):
-                        pr_dt = datetime.fromisoformat(pr_updated.replace('Z', '+00:00'))
-                    else:
-                        pr_dt = datetime.fromisoformat(pr_updated)
+            # Taken before the fetch, so anything landing while it runs is newer than the stored
+            # check time and gets picked up by the next check
+            checked_at = self._timestamp()
 
-                    # Make both datetimes timezone-naive for comparison
-                    if last_check_dt.tzinfo:
-                        last_check_dt = last_check_dt.replace(tzinfo=None)
-                    if pr_dt.tzinfo:
-                        pr_dt = pr_dt.replace(tzinfo=None)
+            since_param = last_check if last_check else (datetime.utcnow() - timedelta(days=7)).isoformat()
 
-                    if pr_dt > last_check_dt:
-                        filtered_pulls.append(pr)
+            # Get recent commits and pull requests
+            commits, commit_count, pulls = self.get_repo_activity(repo_name, since_param)
 
-                pulls = filtered_pulls
+            # Filter pulls updated since last check. Both timestamps are UTC ISO-8601,
+            # so once the 'Z' suffix is dropped they compare correctly as strings
+            if last_check:
+                threshold = last_check.rstrip('Z')
+                pulls = [pr for pr in pulls if pr['updated_at'].rstrip('Z') > threshold]
 
-            total_changes = len(commits) + len(pulls)
+            total_changes = commit_count + len(pulls)
 
             if total_changes == 0:
+                self._queue_etag(repo_name, etag)
                 print(f"No new changes found for {repo_name}")
                 return None
 
-            print(f"Found {len(commits)} commits and {len(pulls)} pull request updates")
+            print(f"Found {commit_count} commits and {len(pulls)} pull request updates for {repo_name}")
 
-            # Format changes and generate summary
-            changes_text = self.format_changes_for_ai(commits, pulls)
-            summary = self.generate_summary(changes_text, repo_name)
+            return {
+                "repo_name": repo_name,
+                "changes_text": self.format_changes_for_ai(commits, pulls),
+                "changes_count": total_changes,
+                # Keep the stored SHA for PR-only changes
+                "last_commit_sha": commits[0]["sha"] if commits else None,
+                "etag": etag,
+                "checked_at": checked_at
+            }
 
-            # Update database
-            if commits:
-                self.update_repo_state(repo_name, commits[0]["sha"])
-            else:
-                # Update timestamp even if no commits (for PR-only changes)
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT OR REPLACE INTO repo_states (repo_name, last_commit_sha, last_check_timestamp)
-                    VALUES (?, COALESCE((SELECT last_commit_sha FROM repo_states WHERE repo_name = ?), ''), ?)
-                ''', (repo_name, repo_name, datetime.utcnow().isoformat()))
-                conn.commit()
-                conn.close()
-
-            self.save_summary(repo_name, summary, total_changes)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching data for {repo_name}: {e}")
+            return None
+        except Exception as e:
+            print(f"Unexpected error for {repo_name}: {e}")
+            return None
 
+    def publish_summary(self, repo_name: str, summary: str, changes_count: int, echo: bool = True):
+        """Print a generated summary and send it to Slack if enabled"""
+        if echo:
             print(f"Generated summary for {repo_name}:")
             print("-" * 50)
             print(summary)
             print("-" * 50)
 
-            # Send Slack notification if enabled
-            if self.slack_notifier:
-                current_time = datetime.utcnow().isoformat()
-                self.slack_notifier.send_summary(repo_name, summary, total_changes, current_time)
+        # Send Slack notification if enabled
+        if self.slack_notifier:
+            current_time = datetime.utcnow().isoformat()
+            self.slack_notifier.send_summary(repo_name, summary, changes_count, current_time)
 
-            return summary
+    def check_repo_for_changes(self, repo_name: str, probe: bool = True) -> Optional[str]:
+        """Check a single repository for changes and generate summary if needed"""
+        self.require_credentials()
 
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching data for {repo_name}: {e}")
+        changes = self.collect_repo_changes(repo_name, probe)
+        if not changes:
+            self._save_pending()
             return None
+
+        try:
+            # Stream the summary so it shows up while the completion is still running
+            print(f"Generated summary for {repo_name}:")
+            print("-" * 50)
+            summary = self.generate_summary(changes["changes_text"], repo_name, stream=True)
+            print("-" * 50)
+
+            self._queue_check_result(changes, summary)
+            self._save_pending()
+
+            self.publish_summary(repo_name, summary, changes["changes_count"], echo=False)
+            return summary
         except Exception as e:
             print(f"Unexpected error for {repo_name}: {e}")
             return None
 
-    def check_all_repos(self, repo_list: List[str]):
+    def check_all_repos(self, repo_list: List[str], probe: bool = True):
         """Check all repositories for changes"""
+        self.require_credentials()
+
         print(f"Starting repository check at {datetime.now()}")
 
-        for repo_name in repo_list:
-            self.check_repo_for_changes(repo_name)
+        # Every row written during this run shares one timestamp
+        self._run_ts = datetime.utcnow().isoformat()
+        try:
+            if repo_list:
+                # Both APIs are I/O bound, so overlap the per-repository round trips
+                with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(repo_list))) as executor:
+                    collected = executor.map(lambda repo_name: self.collect_repo_changes(repo_name, probe), repo_list)
+                    pending = [changes for changes in collected if changes]
+
+                summaries = self.generate_summaries_batch(
+                    {changes["repo_name"]: changes["changes_text"] for changes in pending}
+                )
+
+                for changes in pending:
+                    self._queue_check_result(changes, summaries[changes["repo_name"]])
+
+                # One transaction for every repository checked in this run; the summaries
+                # still go out if it fails
+                self._save_pending()
+
+                for changes in pending:
+                    try:
+                        self.publish_summary(changes["repo_name"], summaries[changes["repo_name"]], changes["changes_count"])
+                    except Exception as e:
+                        print(f"Unexpected error for {changes['repo_name']}: {e}")
+        finally:
+            self._run_ts = None
 
         print(f"Completed repository check at {datetime.now()}")
 
     def get_recent_summaries(self, repo_name: Optional[str] = None, limit: int = 10) -> List[Dict]:
         """Retrieve recent summaries from the database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        if repo_name:
-            cursor.execute('''
-                SELECT repo_name, summary, changes_count, timestamp
-                FROM summaries
-                WHERE repo_name = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ''', (repo_name, limit))
-        else:
-            cursor.execute('''
-                SELECT repo_name, summary, changes_count, timestamp
-                FROM summaries
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ''', (limit,))
+        with self._db_lock:
+            if repo_name:
+                cursor = self._conn.execute(self.SQL_SELECT_REPO_SUMMARIES, (repo_name, limit))
+            else:
+                cursor = self._conn.execute(self.SQL_SELECT_SUMMARIES, (limit,))
 
-        results = cursor.fetchall()
-        conn.close()
+            results = cursor.fetchall()
 
         return [
             {
@@ -359,6 +734,10 @@ Keep each section concise (2-3 sentences max) and highlight the most important c
         return self.slack_notifier.test_connection()
 
 def main():
+    # Only the scheduled loop below needs these
+    import schedule
+    import time
+
     # Load repository configuration
     config_file = os.getenv("REPO_CONFIG_FILE", "repos.json")
 
@@ -393,9 +772,7 @@ def main():
 
     # Schedule regular checks
     for hour in schedule_hours:
-        schedule.every().day.at(f"{hour:02d}:00").do(
-            lambda: bot.check_all_repos(repositories)
-        )
+        schedule.every().day.at(f"{hour:02d}:00").do(bot.check_all_repos, repositories)
 
     print(f"Bot initialized. Monitoring {len(repositories)} repositories.")
     print(f"Scheduled checks at: {', '.join(f'{h}:00' for h in schedule_hours)}")
@@ -405,9 +782,12 @@ def main():
     bot.check_all_repos(repositories)
 
     # Keep the bot running
-    while True:
-        schedule.run_pending()
-        time.sleep(60)
+    try:
+        while True:
+            schedule.run_pending()
+            time.sleep(60)
+    finally:
+        bot.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
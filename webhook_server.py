@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Webhook Receiver Component for GitHub Repository Summary Bot
+
+Accepts GitHub push and pull request webhook deliveries so repositories can be
+summarized as soon as they change instead of waiting for the next scheduled poll.
+"""
+
+import hashlib
+import hmac
+import json
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Set
+
+# GitHub caps webhook payloads at 25 MB
+MAX_PAYLOAD_BYTES = 25 * 1024 * 1024
+
+SUPPORTED_EVENTS = ("push", "pull_request")
+
+
+class WebhookServer:
+    def __init__(self, port: int, secret: Optional[str] = None):
+        """
+        Initialize webhook receiver
+
+        Args:
+            port: Port to listen on
+            secret: Optional webhook secret used to verify X-Hub-Signature-256
+        """
+        self.port = port
+        self.secret = secret
+        self.repo_queue = queue.Queue()
+        self._server = None
+        self._thread = None
+
+    def verify_signature(self, body: bytes, signature: Optional[str]) -> bool:
+        """
+        Verify a delivery's HMAC-SHA256 signature against the configured secret
+
+        Args:
+            body: Raw request body
+            signature: Value of the X-Hub-Signature-256 header
+
+        Returns:
+            True if no secret is configured or the signature matches
+        """
+        if not self.secret:
+            return True
+
+        if not signature:
+            return False
+
+        expected = "sha256=" + hmac.new(self.secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature)
+
+    def handle_delivery(self, event: Optional[str], body: bytes) -> int:
+        """
+        Queue the repository from a webhook delivery
+
+        Args:
+            event: Value of the X-GitHub-Event header
+            body: Raw JSON payload
+
+        Returns:
+            HTTP status code to respond with
+        """
+        if event == "ping":
+            return 200
+
+        if event not in SUPPORTED_EVENTS:
+            return 204
+
+        try:
+            payload = json.loads(body)
+            repo_name = payload["repository"]["full_name"]
+        except (ValueError, KeyError, TypeError):
+            return 400
+
+        self.repo_queue.put(repo_name)
+        return 202
+
+    def wait_for_repos(self, timeout: float) -> Set[str]:
+        """
+        Wait for webhook deliveries and return every repository queued so far
+
+        Args:
+            timeout: Seconds to wait for the first delivery
+
+        Returns:
+            Set of repository names (empty if nothing arrived in time)
+        """
+        try:
+            repos = {self.repo_queue.get(timeout=timeout)}
+        except queue.Empty:
+            return set()
+
+        # Collapse bursts of deliveries for the same repositories into one check
+        while True:
+            try:
+                repos.add(self.repo_queue.get_nowait())
+            except queue.Empty:
+                return repos
+
+    def start(self):
+        """Start serving webhook deliveries on a background thread"""
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                except ValueError:
+                    length = -1
+
+                if length < 0:
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+
+                if length > MAX_PAYLOAD_BYTES:
+                    self.send_response(413)
+                    self.end_headers()
+                    return
+
+                body = self.rfile.read(length)
+                if not receiver.verify_signature(body, self.headers.get("X-Hub-Signature-256")):
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+
+                self.send_response(receiver.handle_delivery(self.headers.get("X-GitHub-Event"), body))
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("", self.port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+        print(f"✅ Listening for GitHub webhooks on port {self.port}")
+        if not self.secret:
+            print("⚠️  GITHUB_WEBHOOK_SECRET not set - webhook deliveries are not verified")
+
+    def stop(self):
+        """Stop the webhook server"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None